@@ -9,6 +9,7 @@ from collections import OrderedDict, defaultdict
 from dataclasses import dataclass, field, replace
 from functools import cached_property, partial
 from types import FunctionType, GenericAlias
+from weakref import WeakKeyDictionary
 
 from .recode import (
     Conformer,
@@ -22,6 +23,11 @@ from .utils import MISSING, UsageError, keyword_decorator, subtler_type
 
 _current_id = itertools.count()
 
+# Maps plain functions to the state their Signature was extracted from, and
+# that Signature. Ovlds analyze the signatures of all their functions every
+# time they are compiled.
+_signature_cache = WeakKeyDictionary()
+
 
 @keyword_decorator
 def _setattrs(fn, **kwargs):
@@ -107,17 +113,20 @@ class LazySignature(inspect.Signature):
         return OrderedDict({p.name: p for p in parameters})
 
 
-def bootstrap_dispatch(ov, name):
-    def first_entry(*args, **kwargs):
-        ov.compile()
-        return ov.dispatch(*args, **kwargs)
+def _first_entry(*args, **kwargs):
+    # OVLD is not a module global: bootstrap_dispatch instantiates this code
+    # with a fresh globals dict in which OVLD is the ovld to compile. The
+    # generated dispatch code later replaces this code and shares the same
+    # globals, which is why neither of them may use a closure.
+    OVLD.compile()
+    return OVLD.dispatch(*args, **kwargs)
+
 
+def bootstrap_dispatch(ov, name):
     dispatch = FunctionType(
-        rename_code(first_entry.__code__, name),
-        {},
+        rename_code(_first_entry.__code__, name),
+        {"OVLD": ov},
         name,
-        (),
-        first_entry.__closure__,
     )
     dispatch.__signature__ = LazySignature(ov)
     dispatch.__ovld__ = ov
@@ -149,6 +158,63 @@ class Arginfo:
         return self.name if self.position is None else self.position
 
 
+def _is_plain_function(fn):
+    return (
+        type(fn) is FunctionType
+        and not hasattr(fn, "__wrapped__")
+        and not hasattr(fn, "__signature__")
+    )
+
+
+def _parameters(fn):
+    """Return the parameters of fn as (name, kind, required, annotation).
+
+    Plain functions are read directly from their code object, which is much
+    cheaper than inspect.signature. Anything else, including functions that
+    wrap another one or define __signature__, goes through inspect.
+    """
+    if not _is_plain_function(fn):
+        sig = inspect.signature(fn)
+        parameters = [
+            (p.name, p.kind, p.default is inspect._empty, p.annotation)
+            for p in sig.parameters.values()
+        ]
+        return parameters, sig.return_annotation
+
+    co = fn.__code__
+    names = co.co_varnames
+    nargs = co.co_argcount
+    nkw = co.co_kwonlyargcount
+    anns = fn.__annotations__
+    ndefaults = len(fn.__defaults__ or ())
+    kwdefaults = fn.__kwdefaults__ or {}
+
+    def param(name, kind, required):
+        return (name, kind, required, anns.get(name, inspect._empty))
+
+    parameters = [
+        param(
+            name,
+            inspect._POSITIONAL_ONLY
+            if i < co.co_posonlyargcount
+            else inspect._POSITIONAL_OR_KEYWORD,
+            i < nargs - ndefaults,
+        )
+        for i, name in enumerate(names[:nargs])
+    ]
+    extra = nargs + nkw
+    if co.co_flags & inspect.CO_VARARGS:
+        parameters.append(param(names[extra], inspect._VAR_POSITIONAL, True))
+        extra += 1
+    parameters.extend(
+        param(name, inspect._KEYWORD_ONLY, name not in kwdefaults)
+        for name in names[nargs : nargs + nkw]
+    )
+    if co.co_flags & inspect.CO_VARKEYWORDS:
+        parameters.append(param(names[extra], inspect._VAR_KEYWORD, True))
+    return parameters, anns.get("return", inspect._empty)
+
+
 @dataclass(frozen=True)
 class Signature:
     types: tuple
@@ -166,53 +232,72 @@ class Signature:
 
     @classmethod
     def extract(cls, fn):
+        if not _is_plain_function(fn):
+            return cls._extract(fn)
+        # Everything the signature is computed from, so that a function whose
+        # code, defaults or annotations were changed is analyzed again
+        state = (
+            fn.__code__,
+            len(fn.__defaults__ or ()),
+            tuple(fn.__kwdefaults__ or ()),
+            tuple(fn.__annotations__.items()),
+        )
+        cached = _signature_cache.get(fn, None)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        sig = cls._extract(fn)
+        _signature_cache[fn] = (state, sig)
+        return sig
+
+    @classmethod
+    def _extract(cls, fn):
         typelist = []
-        sig = inspect.signature(fn)
+        parameters, return_annotation = _parameters(fn)
         max_pos = 0
         req_pos = 0
         req_names = set()
         is_method = False
 
         arginfo = []
-        for i, (name, param) in enumerate(sig.parameters.items()):
+        for i, (name, kind, required, annotation) in enumerate(parameters):
             if name == "self":
                 assert i == 0
                 is_method = True
                 continue
             pos = nm = None
-            ann = normalize_type(param.annotation, fn)
-            if param.kind is inspect._POSITIONAL_ONLY:
+            ann = normalize_type(annotation, fn)
+            if kind is inspect._POSITIONAL_ONLY:
                 pos = i - is_method
                 typelist.append(ann)
-                req_pos += param.default is inspect._empty
+                req_pos += required
                 max_pos += 1
-            elif param.kind is inspect._POSITIONAL_OR_KEYWORD:
+            elif kind is inspect._POSITIONAL_OR_KEYWORD:
                 pos = i - is_method
-                nm = param.name
+                nm = name
                 typelist.append(ann)
-                req_pos += param.default is inspect._empty
+                req_pos += required
                 max_pos += 1
-            elif param.kind is inspect._KEYWORD_ONLY:
-                nm = param.name
-                typelist.append((param.name, ann))
-                if param.default is inspect._empty:
-                    req_names.add(param.name)
-            elif param.kind is inspect._VAR_POSITIONAL:
+            elif kind is inspect._KEYWORD_ONLY:
+                nm = name
+                typelist.append((name, ann))
+                if required:
+                    req_names.add(name)
+            elif kind is inspect._VAR_POSITIONAL:
                 raise TypeError("ovld does not support *args")
-            elif param.kind is inspect._VAR_KEYWORD:
+            elif kind is inspect._VAR_KEYWORD:
                 raise TypeError("ovld does not support **kwargs")
             arginfo.append(
                 Arginfo(
                     position=pos,
                     name=nm,
-                    required=param.default is inspect._empty,
-                    ann=normalize_type(param.annotation, fn),
+                    required=required,
+                    ann=ann,
                 )
             )
 
         return cls(
             types=tuple(typelist),
-            return_type=normalize_type(sig.return_annotation, fn),
+            return_type=normalize_type(return_annotation, fn),
             req_pos=req_pos,
             max_pos=max_pos,
             req_names=frozenset(req_names),
@@ -237,8 +322,10 @@ def sigstring(types):
 
 class ArgumentAnalyzer:
     def __init__(self):
-        self.name_to_positions = defaultdict(set)
-        self.position_to_names = defaultdict(set)
+        # These rarely hold more than one element per key, so lists are used
+        # rather than sets, which also keeps them in registration order
+        self.name_to_positions = defaultdict(list)
+        self.position_to_names = defaultdict(list)
         self.counts = defaultdict(lambda: [0, 0])
         self.complex_transforms = set()
         self.total = 0
@@ -253,9 +340,13 @@ class ArgumentAnalyzer:
         )
         for arg in sig.arginfo:
             if arg.position is not None:
-                self.position_to_names[arg.position].add(arg.name)
+                names = self.position_to_names[arg.position]
+                if arg.name not in names:
+                    names.append(arg.name)
             if arg.name is not None:
-                self.name_to_positions[arg.name].add(arg.canonical)
+                positions = self.name_to_positions[arg.name]
+                if arg.canonical not in positions:
+                    positions.append(arg.canonical)
 
             cnt = self.counts[arg.canonical]
             cnt[0] += arg.required
@@ -284,9 +375,7 @@ class ArgumentAnalyzer:
                         f"Argument '{name}' is declared in a positional and keyword setting by different methods. It should be either."
                     )
 
-        p_to_n = [
-            list(names) for _, names in sorted(self.position_to_names.items())
-        ]
+        p_to_n = [names for _, names in sorted(self.position_to_names.items())]
 
         positional = list(
             itertools.takewhile(
@@ -70,6 +70,7 @@ def is_dependent(t):
 class DependentType(type):
     exclusive_type = False
     keyable_type = False
+    antichain_type = False
     bound_is_name = False
 
     def __new__(cls, *args, **kwargs):
@@ -247,6 +248,7 @@ def dependent_check(fn=None, bound_is_name=False):
 
 class Equals(ParametrizedDependentType):
     keyable_type = True
+    antichain_type = True
 
     def default_bound(self, *parameters):
         return type(parameters[0])
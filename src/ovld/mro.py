@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from graphlib import TopologicalSorter
+from graphlib import CycleError
 from typing import get_args, get_origin
 
 from .utils import UnionTypes
@@ -50,7 +50,7 @@ def typeorder(t1, t2):
     * typeorder(t1, t2) is Order.MORE   if t1 is more general than t2
     * typeorder(t1, t2) is Order.NONE   if they cannot be compared
     """
-    if t1 == t2:
+    if t1 is t2 or t1 == t2:
         return Order.SAME
 
     if (
@@ -108,7 +108,7 @@ def typeorder(t1, t2):
 
 def subclasscheck(t1, t2):
     """Check whether t1 is a "subclass" of t2."""
-    if t1 == t2:
+    if t1 is t2 or t1 == t2:
         return True
 
     if (
@@ -157,23 +157,74 @@ def subclasscheck(t1, t2):
             return False
 
 
+def _bits(mask):
+    """Iterate over the indices of the bits set in mask."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 def sort_types(cls, avail):
     # We filter everything except subclasses and dependent types that *might* cover
     # the object represented by cls.
-    avail = [t for t in avail if subclasscheck(cls, t)]
-    deps = {t: set() for t in avail}
-    for i, t1 in enumerate(avail):
-        for t2 in avail[i + 1 :]:
-            # NOTE: this is going to scale poorly when there's a hundred Literal in the pool
-            order = typeorder(t1, t2)
-            if order is Order.LESS:
-                deps[t2].add(t1)
-            elif order is Order.MORE:
-                deps[t1].add(t2)
-    sorter = TopologicalSorter(deps)
-    sorter.prepare()
-    while sorter.is_active():
-        nodes = sorter.get_ready()
-        yield nodes
-        for n in nodes:
-            sorter.done(n)
+    if type(cls) is type and not hasattr(cls, "__is_subtype__"):
+        # Fast path: for plain classes without custom subtyping hooks,
+        # subclasscheck amounts to membership in the mro.
+        mro = set(cls.__mro__)
+        avail = [
+            t
+            for t in avail
+            if (
+                t in mro
+                if type(t) is type and not hasattr(t, "__is_supertype__")
+                else subclasscheck(cls, t)
+            )
+        ]
+    else:
+        avail = [t for t in avail if subclasscheck(cls, t)]
+    n = len(avail)
+    # The graph is stored as bitmasks over the indices in avail: preds[j] has
+    # bit i set if avail[i] must come before avail[j], and succ[i] is the
+    # reverse relation.
+    preds = [0] * n
+    succ = [0] * n
+    # Types of an antichain_type (e.g. Equals, which Literal normalizes to) that
+    # share the same bound are never ordered relative to each other, so they
+    # are grouped together and only compared with types outside their group.
+    groups = {}
+    for i, t in enumerate(avail):
+        key = (type(t), t.bound) if getattr(t, "antichain_type", False) else i
+        groups.setdefault(key, []).append(i)
+    groups = list(groups.values())
+    for gi, grp1 in enumerate(groups):
+        for grp2 in groups[gi + 1 :]:
+            for i in grp1:
+                for j in grp2:
+                    order = typeorder(avail[i], avail[j])
+                    if order is Order.LESS:
+                        preds[j] |= 1 << i
+                        succ[i] |= 1 << j
+                    elif order is Order.MORE:
+                        preds[i] |= 1 << j
+                        succ[j] |= 1 << i
+    ready = [i for i in range(n) if not preds[i]]
+    emitted = 0
+    while ready:
+        yield tuple(avail[i] for i in ready)
+        emitted += len(ready)
+        done = 0
+        candidates = 0
+        for i in ready:
+            done |= 1 << i
+            candidates |= succ[i]
+        ready = []
+        for j in _bits(candidates):
+            preds[j] &= ~done
+            if not preds[j]:
+                ready.append(j)
+    if emitted < n:
+        # Types on a cycle never become ready, which can only happen if some
+        # __type_order__ is inconsistent
+        remaining = [t for i, t in enumerate(avail) if preds[i]]
+        raise CycleError("types are not consistently ordered", remaining)
@@ -1,11 +1,13 @@
 import ast
 import inspect
 import linecache
+import sys
 import textwrap
 from ast import _splitlines_no_ff as splitlines
-from functools import reduce
+from functools import lru_cache
 from itertools import count
 from types import CodeType, FunctionType
+from weakref import WeakKeyDictionary
 
 from .utils import MISSING, NameDatabase, Unusable, UsageError, subtler_type
 
@@ -17,43 +19,74 @@ call_next = Unusable(
 )
 
 
+# Many ovlds share the same argument shape and therefore generate the exact
+# same source, so compiled code is memoized by source. The cache is bounded
+# because dependent dispatch sources embed literal keys and can keep varying.
+@lru_cache(maxsize=1024)
+def _compile(code, filename):
+    return compile(source=code, filename=filename, mode="exec")
+
+
 def instantiate_code(symbol, code, inject={}):
     virtual_file = f"<ovld:{abs(hash(code)):x}>"
-    linecache.cache[virtual_file] = (None, None, splitlines(code), virtual_file)
-    code = compile(source=code, filename=virtual_file, mode="exec")
+    if virtual_file not in linecache.cache:
+        # Registered again if linecache was cleared, so that tracebacks from
+        # cached code still show the source
+        linecache.cache[virtual_file] = (
+            None,
+            None,
+            splitlines(code),
+            virtual_file,
+        )
     glb = {**inject}
-    exec(code, glb, glb)
+    exec(_compile(code, virtual_file), glb, glb)
     return glb[symbol]
 
 
-# # Previous version: generate a temporary file
-# def instantiate_code(symbol, code, inject={}):
-#     tf = tempfile.NamedTemporaryFile("w")
-#     _tempfiles.append(tf)
-#     tf.write(code)
-#     tf.flush()
-#     glb = runpy.run_path(tf.name)
-#     rval = glb[symbol]
-#     rval.__globals__.update(inject)
-#     return rval
+# Dispatchers with at most this many optional keyword arguments get one branch
+# per combination of present keywords, instead of collecting them in lists
+MAX_SPECIALIZED_KEYWORDS = 3
 
+# Maps argument shapes to the source code of their dispatch, the name under
+# which the dispatch expects the type map, and the other globals it needs.
+_dispatch_cache = {}
 
-dispatch_template = """
-def __WRAP_DISPATCH__(OVLD):
-    def __DISPATCH__({args}):
-        {body}
 
-    return __DISPATCH__
-"""
+def generate_dispatch(ov, arganal):
+    arganal.compile()
+    shape = (
+        arganal.is_method,
+        tuple(arganal.strict_positional_required),
+        tuple(arganal.strict_positional_optional),
+        tuple(arganal.positional_required),
+        tuple(arganal.positional_optional),
+        tuple(arganal.keyword_required),
+        tuple(arganal.keyword_optional),
+        frozenset(arganal.complex_transforms),
+    )
+    if shape not in _dispatch_cache:
+        _dispatch_cache[shape] = _generate_dispatch_code(arganal)
+    code, mapname, single, variables = _dispatch_cache[shape]
+    return instantiate_code(
+        "__DISPATCH__",
+        code,
+        inject={mapname: ov.map.single if single else ov.map, **variables},
+    )
+
 
+def _clear_codegen_cache():
+    """Clear the caches of generated and compiled code.
 
-call_template = """
-{mvar} = OVLD.map[({lookup})]
-return {mvar}({posargs})
-"""
+    Signatures and compiled annotations are cached elsewhere and validated
+    on use, so they are not cleared.
+    """
+    _compile.cache_clear()
+    _dispatch_cache.clear()
+    _source_cache.clear()
+    _recode_cache.clear()
 
 
-def generate_dispatch(ov, arganal):
+def _generate_dispatch_code(arganal):
     def join(li, sep=", ", trail=False):
         li = [x for x in li if x]
         rval = sep.join(li)
@@ -61,8 +94,6 @@ def generate_dispatch(ov, arganal):
             rval += ","
         return rval
 
-    arganal.compile()
-
     spr = arganal.strict_positional_required
     spo = arganal.strict_positional_optional
     pr = arganal.positional_required
@@ -70,32 +101,36 @@ def generate_dispatch(ov, arganal):
     kr = arganal.keyword_required
     ko = arganal.keyword_optional
 
-    inits = set()
-
-    kwargsstar = ""
-    targsstar = ""
+    # A dict rather than a set keeps the generated source deterministic
+    inits = {}
 
     args = ["self" if arganal.is_method else ""]
-    body = [""]
+    body = []
     posargs = ["self" if arganal.is_method else ""]
     lookup = []
 
     i = 0
     ndb = NameDatabase(default_name="INJECT")
 
-    def lookup_for(x):
-        return ndb[arganal.lookup_for(x)]
-
     for name in spr + spo + pr + po + kr:
         ndb.register(name)
 
     mv = ndb.gensym(desired_name="method")
+    mapname = ndb.gensym(desired_name="__MAP__")
+    missing = ndb.gensym(desired_name="__MISSING__")
+    lookups = {}
+
+    def lookup_for(x):
+        fn = arganal.lookup_for(x)
+        if fn not in lookups:
+            lookups[fn] = ndb.gensym(desired_name=f"__{fn.__name__}__")
+        return lookups[fn]
 
     for name in spr + spo:
         if name in spr:
             args.append(name)
         else:
-            args.append(f"{name}=MISSING")
+            args.append(f"{name}={missing}")
         posargs.append(name)
         lookup.append(f"{lookup_for(i)}({name})")
         i += 1
@@ -111,7 +146,7 @@ def generate_dispatch(ov, arganal):
         if name in pr:
             args.append(name)
         else:
-            args.append(f"{name}=MISSING")
+            args.append(f"{name}={missing}")
         posargs.append(name)
         lookup.append(f"{lookup_for(i)}({name})")
         i += 1
@@ -122,52 +157,93 @@ def generate_dispatch(ov, arganal):
     if kr or ko:
         args.append("*")
 
+    kwlookup = []
+    kwposargs = []
+
     for name in kr:
         args.append(f"{name}")
-        posargs.append(f"{name}={name}")
-        lookup.append(f"({name!r}, {lookup_for(name)}({name}))")
+        kwposargs.append(f"{name}={name}")
+        kwlookup.append(f"({name!r}, {lookup_for(name)}({name}))")
 
     for name in ko:
-        args.append(f"{name}=MISSING")
-        kwargsstar = "**KWARGS"
-        targsstar = "*TARGS"
-        inits.add("KWARGS = {}")
-        inits.add("TARGS = []")
-        body.append(f"if {name} is not MISSING:")
-        body.append(f"    KWARGS[{name!r}] = {name}")
-        body.append(f"    TARGS.append(({name!r}, {lookup_for(name)}({name})))")
-
-    posargs.append(kwargsstar)
-    lookup.append(targsstar)
-
-    fullcall = call_template.format(
-        lookup=join(lookup, trail=True),
-        posargs=join(posargs),
-        mvar=mv,
-    )
-
-    calls = []
-    if spo or po:
-        req = len(spr + pr)
-        for i, arg in enumerate(spo + po):
-            call = call_template.format(
-                lookup=join(lookup[: req + i], trail=True),
-                posargs=join(posargs[: req + i + 1]),
-                mvar=mv,
+        args.append(f"{name}={missing}")
+
+    # With few optional keyword arguments, generate one branch per combination
+    # of the ones that are present, rather than building lists at every call.
+    specialized = ko if len(ko) <= MAX_SPECIALIZED_KEYWORDS else []
+    if not specialized:
+        for name in ko:
+            inits["KWARGS = {}"] = None
+            inits["TARGS = []"] = None
+            body.append(f"if {name} is not {missing}:")
+            body.append(f"    KWARGS[{name!r}] = {name}")
+            body.append(
+                f"    TARGS.append(({name!r}, {lookup_for(name)}({name})))"
             )
-            call = textwrap.indent(call, "        ")
-            calls.append(f"\nif {arg} is MISSING:{call}")
-    calls.append(fullcall)
-
-    lines = [*inits, *body, textwrap.indent("".join(calls), "        ")]
-    code = dispatch_template.format(
-        args=join(args),
-        body=join(lines, sep="\n        ").lstrip(),
-    )
-    wr = instantiate_code(
-        "__WRAP_DISPATCH__", code, inject={"MISSING": MISSING, **ndb.variables}
+        if ko:
+            kwlookup.append("*TARGS")
+            kwposargs.append("**KWARGS")
+
+    # With a single positional argument, index the map with its type directly
+    single = not (spo or po or kr or ko) and len(spr + pr) == 1
+
+    optional = spo + po
+    req = len(spr + pr)
+
+    def indent(lines):
+        return [f"    {line}" for line in lines]
+
+    def call(n, kwlookup, kwposargs):
+        # Call with the first n optional positional arguments
+        lk = lookup[: req + n] + kwlookup
+        key = lk[0] if single else f"({join(lk, trail=True)})"
+        return [
+            f"{mv} = {mapname}[{key}]",
+            f"return {mv}({join(posargs[: req + n + 1] + kwposargs)})",
+        ]
+
+    def positional_branches(kwlookup, kwposargs):
+        lines = []
+        opt = optional
+        if len(opt) > 1 and not (spo and len(po) == 1):
+            # All optional arguments are strictly positional, so if the last
+            # one is given, all of them are. Check that first, since it is the
+            # most common case, then find the first missing one.
+            lines.append(f"if {opt[-1]} is not {missing}:")
+            lines.extend(indent(call(len(opt), kwlookup, kwposargs)))
+            opt = opt[:-1]
+        for i, arg in enumerate(opt):
+            lines.append(f"if {arg} is {missing}:")
+            lines.extend(indent(call(i, kwlookup, kwposargs)))
+        lines.extend(call(len(opt), kwlookup, kwposargs))
+        return lines
+
+    def keyword_branches(names, kwlookup, kwposargs):
+        if not names:
+            return positional_branches(kwlookup, kwposargs)
+        name, *rest = names
+        return [
+            f"if {name} is {missing}:",
+            *indent(keyword_branches(rest, kwlookup, kwposargs)),
+            *keyword_branches(
+                rest,
+                [*kwlookup, f"({name!r}, {lookup_for(name)}({name}))"],
+                [*kwposargs, f"{name}={name}"],
+            ),
+        ]
+
+    lines = [*inits, *body, *keyword_branches(specialized, kwlookup, kwposargs)]
+
+    # These are injected in the globals of the dispatch. They must not be
+    # parameters, or callers could override them with keyword arguments.
+    variables = {v: k for k, v in lookups.items()}
+    if spo or po or ko:
+        variables[missing] = MISSING
+
+    code = "\n".join(
+        [f"def __DISPATCH__({join(args)}):", *(f"    {line}" for line in lines)]
     )
-    return wr(ov)
+    return code, mapname, single, variables
 
 
 def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
@@ -182,18 +258,22 @@ def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
     def argname(x):
         return f"ARG{x}" if isinstance(x, int) else x
 
-    def argprovide(x):
-        return f"ARG{x}" if isinstance(x, int) else f"{x}={x}"
+    # Handlers often share the condition on some of their arguments
+    checks = {}
 
     def codegen(typ, arg):
-        cg = generate_checking_code(typ)
-        return cg.template.format(
-            arg=arg, **{k: ndb[v] for k, v in cg.substitutions.items()}
-        )
+        if (typ, arg) not in checks:
+            cg = generate_checking_code(typ)
+            checks[typ, arg] = cg.template.format(
+                arg=arg, **{k: ndb[v] for k, v in cg.substitutions.items()}
+            )
+        return checks[typ, arg]
 
     tup = to_dict(tup)
     handlers = [(h, to_dict(types)) for h, types in handlers]
     ndb = NameDatabase(default_name="INJECT")
+    for x in tup:
+        ndb.register(argname(x))
     conjs = []
 
     exclusive = False
@@ -202,21 +282,22 @@ def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
     for k in tup:
         featured = set(types[k] for h, types in handlers)
         if len(featured) == len(handlers):
-            possibilities = set(type(t) for t in featured)
-            focus = possibilities.pop()
-            # Possibilities is now empty if only one type of DependentType
+            it = iter(featured)
+            focus = type(next(it))
 
-            if not possibilities:
+            if all(type(t) is focus for t in it):
+                # Only one type of DependentType
                 if getattr(focus, "keyable_type", False):
                     all_keys = [
                         {key: h for key in types[k].get_keys()}
                         for h, types in handlers
                     ]
-                    keyed = reduce(lambda a, b: {**a, **b}, all_keys)
-                    if (
-                        len(keyed) == sum(map(len, all_keys))
-                        and len(featured) < 4
-                    ):
+                    keyed = {}
+                    total = 0
+                    for keys in all_keys:
+                        keyed.update(keys)
+                        total += len(keys)
+                    if len(keyed) == total and len(featured) < 4:
                         exclusive = True
                         keyexpr = None
                     else:
@@ -240,8 +321,17 @@ def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
     if len(handlers) == 1:
         exclusive = True
 
-    argspec = ", ".join(argname(x) for x in tup)
-    argcall = ", ".join(argprovide(x) for x in tup)
+    names = []
+    provides = []
+    for x in tup:
+        if isinstance(x, int):
+            names.append(f"ARG{x}")
+            provides.append(f"ARG{x}")
+        else:
+            names.append(x)
+            provides.append(f"{x}={x}")
+    argspec = ", ".join(names)
+    argcall = ", ".join(provides)
 
     body = []
     if keyexpr:
@@ -254,21 +344,14 @@ def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
         body.append(f"return FALLTHROUGH({slf}{argcall})")
 
     else:
+        # Return on the first match, but only after checking that none of the
+        # conditions that follow it also match, which would be ambiguous.
         for i, conj in enumerate(conjs):
-            body.append(f"MATCH{i} = {conj}")
-
-        summation = " + ".join(f"MATCH{i}" for i in range(len(handlers)))
-        body.append(f"SUMMATION = {summation}")
-        body.append("if SUMMATION == 1:")
-        for i, (h, types) in enumerate(handlers):
-            body.append(f"    if MATCH{i}: return HANDLER{i}({slf}{argcall})")
-        body.append("elif SUMMATION == 0:")
-        body.append(f"    return FALLTHROUGH({slf}{argcall})")
-        body.append("else:")
-        body.append(f"    raise {ndb[err]}")
-
-    body_text = textwrap.indent("\n".join(body), "    ")
-    code = f"def __DEPENDENT_DISPATCH__({slf}{argspec}):\n{body_text}"
+            body.append(f"{'elif' if i else 'if'} {conj}:")
+            if others := " or ".join(f"({c})" for c in conjs[i + 1 :]):
+                body.append(f"    if {others}: raise {ndb[err]}")
+            body.append(f"    return HANDLER{i}({slf}{argcall})")
+        body.append(f"return FALLTHROUGH({slf}{argcall})")
 
     inject = ndb.variables
     for i, (h, types) in enumerate(handlers):
@@ -279,6 +362,15 @@ def generate_dependent_dispatch(tup, handlers, next_call, slf, name, err, nerr):
 
     inject["FALLTHROUGH"] = (next_call and next_call[0]) or raise_error
 
+    # As in the main dispatch, injected values are globals rather than
+    # parameters, so that they cannot be overridden by keyword arguments
+    code = "\n".join(
+        [
+            f"def __DEPENDENT_DISPATCH__({slf}{argspec}):",
+            *(f"    {line}" for line in body),
+        ]
+    )
+
     fn = instantiate_code(
         symbol="__DEPENDENT_DISPATCH__", code=code, inject=inject
     )
@@ -330,29 +422,10 @@ class Conformer:
 
 
 def rename_code(co, newname):  # pragma: no cover
-    if hasattr(co, "replace"):
-        if hasattr(co, "co_qualname"):
-            return co.replace(co_name=newname, co_qualname=newname)
-        else:
-            return co.replace(co_name=newname)
+    if sys.version_info >= (3, 11):
+        return co.replace(co_name=newname, co_qualname=newname)
     else:
-        return type(co)(
-            co.co_argcount,
-            co.co_kwonlyargcount,
-            co.co_nlocals,
-            co.co_stacksize,
-            co.co_flags,
-            co.co_code,
-            co.co_consts,
-            co.co_names,
-            co.co_varnames,
-            co.co_filename,
-            newname,
-            co.co_firstlineno,
-            co.co_lnotab,
-            co.co_freevars,
-            co.co_cellvars,
-        )
+        return co.replace(co_name=newname)
 
 
 def rename_function(fn, newname):
@@ -366,6 +439,12 @@ def rename_function(fn, newname):
     return new_fn
 
 
+# Expression contexts carry no location or state, so a single instance of each
+# can be shared by all the nodes we generate.
+_load = ast.Load()
+_store = ast.Store()
+
+
 class NameConverter(ast.NodeTransformer):
     def __init__(
         self,
@@ -375,6 +454,7 @@ class NameConverter(ast.NodeTransformer):
         ovld_mangled,
         map_mangled,
         code_mangled,
+        lines,
     ):
         self.analysis = anal
         self.recurse_sym = recurse_sym
@@ -383,9 +463,22 @@ class NameConverter(ast.NodeTransformer):
         self.map_mangled = map_mangled
         self.code_mangled = code_mangled
         self.count = count()
+        self.changed = False
+        self.lines = lines
+
+    def generic_visit(self, node):
+        # Skip statements and expressions that span none of the lines where
+        # the symbols appear: nothing in them can need rewriting.
+        end = getattr(node, "end_lineno", None)
+        if end is not None and not any(
+            node.lineno <= line <= end for line in self.lines
+        ):
+            return node
+        return super().generic_visit(node)
 
     def visit_Name(self, node):
         if node.id == self.recurse_sym:
+            self.changed = True
             return ast.copy_location(
                 old_node=node,
                 new_node=ast.Name(self.ovld_mangled, ctx=node.ctx),
@@ -415,10 +508,10 @@ class NameConverter(ast.NodeTransformer):
                 else "type"
             )
             value = ast.NamedExpr(
-                target=ast.Name(id=f"{tmp}{key}", ctx=ast.Store()),
+                target=ast.Name(id=f"{tmp}{key}", ctx=_store),
                 value=self.visit(arg),
             )
-            func = ast.Name(id=name, ctx=ast.Load())
+            func = ast.Name(id=name, ctx=_load)
             return ast.Call(
                 func=func,
                 args=[value],
@@ -437,23 +530,23 @@ class NameConverter(ast.NodeTransformer):
                     ast.Constant(value=kw.arg),
                     _make_lookup_call(kw.arg, kw.value),
                 ],
-                ctx=ast.Load(),
+                ctx=_load,
             )
             for kw in node.keywords
         ]
 
         if cn:
-            type_parts.insert(0, ast.Name(id=self.code_mangled, ctx=ast.Load()))
+            type_parts.insert(0, ast.Name(id=self.code_mangled, ctx=_load))
         method = ast.Subscript(
-            value=ast.Name(id=self.map_mangled, ctx=ast.Load()),
+            value=ast.Name(id=self.map_mangled, ctx=_load),
             slice=ast.Tuple(
                 elts=type_parts,
-                ctx=ast.Load(),
+                ctx=_load,
             ),
-            ctx=ast.Load(),
+            ctx=_load,
         )
         if self.analysis.is_method:
-            selfarg = [ast.Name(id="self", ctx=ast.Load())]
+            selfarg = [ast.Name(id="self", ctx=_load)]
         else:
             selfarg = []
 
@@ -461,47 +554,56 @@ class NameConverter(ast.NodeTransformer):
             func=method,
             args=selfarg
             + [
-                ast.Name(id=f"{tmp}{i}", ctx=ast.Load())
+                ast.Name(id=f"{tmp}{i}", ctx=_load)
                 for i, arg in enumerate(node.args)
             ],
             keywords=[
                 ast.keyword(
                     arg=kw.arg,
-                    value=ast.Name(id=f"{tmp}{kw.arg}", ctx=ast.Load()),
+                    value=ast.Name(id=f"{tmp}{kw.arg}", ctx=_load),
                 )
                 for kw in node.keywords
             ],
         )
+        self.changed = True
         return ast.copy_location(old_node=node, new_node=new_node)
 
 
-def _search_names(co, values, glb, closure=None):
-    if isinstance(co, CodeType):
-        if closure is not None:
-            for varname, cell in zip(co.co_freevars, closure):
-                if any(cell.cell_contents is v for v in values):
-                    yield varname
+def _search_names(co, groups, glb, closure=None):
+    # Yields (i, name) for each name that refers to a value in groups[i]
+    ids = {id(v): i for i, values in enumerate(groups) for v in values}
+    if closure is not None:
+        for varname, cell in zip(co.co_freevars, closure):
+            i = ids.get(id(cell.cell_contents), None)
+            if i is not None:
+                yield i, varname
+    # Walk nested code objects depth first, in the same order as co_consts
+    stack = [co]
+    while stack:
+        co = stack.pop()
         for name in co.co_names:
-            if any(glb.get(name, None) is v for v in values):
-                yield name
-        else:
-            for ct in co.co_consts:
-                yield from _search_names(ct, values, glb)
+            i = ids.get(id(glb.get(name, None)), None)
+            if i is not None:
+                yield i, name
+        stack.extend(
+            ct for ct in reversed(co.co_consts) if isinstance(ct, CodeType)
+        )
 
 
 def adapt_function(fn, ovld, newname):
     """Create a copy of the function with a different name."""
-    rec_syms = list(
-        _search_names(
-            fn.__code__,
-            (recurse, ovld, ovld.dispatch),
-            fn.__globals__,
-            fn.__closure__,
-        )
-    )
-    cn_syms = list(
-        _search_names(fn.__code__, (call_next,), fn.__globals__, fn.__closure__)
-    )
+    rec_syms = []
+    cn_syms = []
+    for i, name in _search_names(
+        fn.__code__,
+        ((recurse, ovld, ovld.dispatch), (call_next,)),
+        fn.__globals__,
+        fn.__closure__,
+    ):
+        (cn_syms if i else rec_syms).append(name)
+        if rec_syms and cn_syms:
+            # Only the first name of each kind is used
+            break
     if rec_syms or cn_syms:
         return recode(
             fn, ovld, rec_syms and rec_syms[0], cn_syms and cn_syms[0], newname
@@ -525,7 +627,7 @@ def closure_wrap(tree, fname, names):
             ),
             body=[
                 tree,
-                ast.Return(ast.Name(id=fname, ctx=ast.Load())),
+                ast.Return(ast.Name(id=fname, ctx=_load)),
             ],
             decorator_list=[],
             returns=None,
@@ -536,37 +638,79 @@ def closure_wrap(tree, fname, names):
     return ast.Module(body=[wrap], type_ignores=[])
 
 
+def _uses_names(tree, names):
+    names = set(names)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id in names:
+                return True
+        elif isinstance(node, ast.Nonlocal):
+            if names.intersection(node.names):
+                return True
+    return False
+
+
+# Maps code objects to the dedented source code of their function, so that
+# functions recoded again when an ovld is recompiled are not looked up again.
+_source_cache = WeakKeyDictionary()
+
+
+def _get_source(fn):
+    src = _source_cache.get(fn.__code__, None)
+    if src is None:
+        try:
+            src = inspect.getsource(fn)
+        except OSError:  # pragma: no cover
+            raise OSError(
+                f"ovld is unable to rewrite {fn} because it cannot read its source code."
+                " It may be an issue with __pycache__, so try to either change the source"
+                " to force a refresh, or remove __pycache__ altogether. If that does not work,"
+                " avoid calling recurse()/call_next()"
+            )
+        src = _source_cache[fn.__code__] = textwrap.dedent(src)
+    return src
+
+
+# Maps code objects to the code recode() generated from them. An ovld recodes
+# all of its functions each time it is recompiled, which usually produces the
+# exact same code. Keying on the code rather than the function means that a
+# function whose __code__ was replaced is recoded again.
+_recode_cache = WeakKeyDictionary()
+
+
 def recode(fn, ovld, recurse_sym, call_next_sym, newname):
-    ovld_mangled = f"___OVLD{ovld.id}"
-    map_mangled = f"___MAP{ovld.id}"
-    code_mangled = f"___CODE{next(_current)}"
-    try:
-        src = inspect.getsource(fn)
-    except OSError:  # pragma: no cover
-        raise OSError(
-            f"ovld is unable to rewrite {fn} because it cannot read its source code."
-            " It may be an issue with __pycache__, so try to either change the source"
-            " to force a refresh, or remove __pycache__ altogether. If that does not work,"
-            " avoid calling recurse()/call_next()"
+    # These are inserted in the function's globals, so they are interned like
+    # the names the compiled code will look them up with.
+    ovld_mangled = sys.intern(f"___OVLD{ovld.id}")
+    map_mangled = sys.intern(f"___MAP{ovld.id}")
+    anal = ovld.argument_analysis
+    key = (
+        ovld.id,
+        recurse_sym or None,
+        call_next_sym or None,
+        newname,
+        anal.is_method,
+        frozenset(anal.complex_transforms),
+    )
+    entries = _recode_cache.setdefault(fn.__code__, {})
+    if key in entries:
+        new_code, code_mangled = entries[key]
+    else:
+        code_mangled = sys.intern(f"___CODE{next(_current)}")
+        new_code = _recode(
+            fn,
+            anal,
+            recurse_sym,
+            call_next_sym,
+            ovld_mangled,
+            map_mangled,
+            code_mangled,
         )
-    tree = ast.parse(textwrap.dedent(src))
-    new = NameConverter(
-        anal=ovld.argument_analysis,
-        recurse_sym=recurse_sym,
-        call_next_sym=call_next_sym,
-        ovld_mangled=ovld_mangled,
-        map_mangled=map_mangled,
-        code_mangled=code_mangled,
-    ).visit(tree)
-    new.body[0].decorator_list = []
-    if fn.__closure__:
-        new = closure_wrap(new.body[0], "irrelevant", fn.__code__.co_freevars)
-    ast.fix_missing_locations(new)
-    ast.increment_lineno(new, fn.__code__.co_firstlineno - 1)
-    res = compile(new, mode="exec", filename=fn.__code__.co_filename)
-    if fn.__closure__:
-        res = [x for x in res.co_consts if isinstance(x, CodeType)][0]
-    (*_, new_code) = [ct for ct in res.co_consts if isinstance(ct, CodeType)]
+        if new_code is not None:
+            new_code = rename_code(new_code, newname)
+        entries[key] = new_code, code_mangled
+    if new_code is None:
+        return rename_function(fn, newname)
     new_closure = tuple(
         [
             fn.__closure__[fn.__code__.co_freevars.index(name)]
@@ -574,13 +718,75 @@ def recode(fn, ovld, recurse_sym, call_next_sym, newname):
         ]
     )
     new_fn = FunctionType(
-        new_code, fn.__globals__, newname, fn.__defaults__, new_closure
+        new_code,
+        fn.__globals__,
+        newname,
+        fn.__defaults__,
+        new_closure,
     )
     new_fn.__kwdefaults__ = fn.__kwdefaults__
     new_fn.__annotations__ = fn.__annotations__
-    new_fn = rename_function(new_fn, newname)
     new_fn.__globals__["__SUBTLER_TYPE"] = subtler_type
     new_fn.__globals__[ovld_mangled] = ovld.dispatch
     new_fn.__globals__[map_mangled] = ovld.map
     new_fn.__globals__[code_mangled] = new_fn.__code__
     return new_fn
+
+
+def _recode(
+    fn,
+    anal,
+    recurse_sym,
+    call_next_sym,
+    ovld_mangled,
+    map_mangled,
+    code_mangled,
+):
+    src = _get_source(fn)
+    syms = [sym for sym in (recurse_sym, call_next_sym) if sym]
+    lines = [
+        i
+        for i, line in enumerate(splitlines(src), start=1)
+        if any(sym in line for sym in syms)
+    ]
+    tree = ast.parse(src)
+    converter = NameConverter(
+        anal=anal,
+        recurse_sym=recurse_sym,
+        call_next_sym=call_next_sym,
+        ovld_mangled=ovld_mangled,
+        map_mangled=map_mangled,
+        code_mangled=code_mangled,
+        lines=lines,
+    )
+    new = converter.visit(tree)
+    if not converter.changed:
+        # The names were found, but not used as variables, e.g. x.recurse
+        return None
+    new.body[0].decorator_list = []
+    freevars = fn.__code__.co_freevars
+    # Free variables may only have been used to refer to recurse or call_next,
+    # in which case the rewritten function does not need a closure. The
+    # implicit __class__ cell used by super() is not referred to by any Name,
+    # so it always requires one.
+    wrap = fn.__closure__ and (
+        "__class__" in freevars or _uses_names(new, freevars)
+    )
+    if wrap:
+        new = closure_wrap(new.body[0], "irrelevant", freevars)
+    ast.fix_missing_locations(new)
+    ast.increment_lineno(new, fn.__code__.co_firstlineno - 1)
+    res = compile(new, mode="exec", filename=fn.__code__.co_filename)
+    if wrap:
+        res = _find_code(res, "##create_closure")
+    return _find_code(res, fn.__code__.co_name)
+
+
+def _find_code(co, name):
+    codes = [ct for ct in co.co_consts if isinstance(ct, CodeType)]
+    for ct in codes:
+        if ct.co_name == name:
+            return ct
+    # The code was renamed after the function was defined, so the name in the
+    # source differs. The function's code is the last one created.
+    return codes[-1]
@@ -1,4 +1,3 @@
-import inspect
 import math
 from dataclasses import dataclass
 from itertools import count
@@ -55,6 +54,21 @@ class TypeMap(dict):
             raise KeyError(obj_t)
 
 
+class SingleArgumentMap(dict):
+    """View of a MultiTypeMap for calls with a single positional argument.
+
+    It is indexed with the type of the argument rather than with a 1-tuple,
+    which spares the dispatch from building and hashing that tuple.
+    """
+
+    def __init__(self, map):
+        self.map = map
+
+    def __missing__(self, obj_t):
+        self[obj_t] = handler = self.map[(obj_t,)]
+        return handler
+
+
 @dataclass
 class Candidate:
     handler: object
@@ -107,6 +121,7 @@ class MultiTypeMap(dict):
         self.dispatch_id = count()
         self.all = {}
         self.errors = {}
+        self.single = SingleArgumentMap(self)
 
     def mro(self, obj_t_tup):
         specificities = {}
@@ -207,6 +222,7 @@ class MultiTypeMap(dict):
         from .dependent import is_dependent
 
         self.clear()
+        self.single.clear()
 
         obj_t_tup = sig.types
         entry = (handler, sig)
@@ -303,11 +319,8 @@ class MultiTypeMap(dict):
     def wrap_dependent(self, tup, handlers, group, next_call):
         handlers = list(handlers)
         htup = [(h, self.type_tuples[h]) for h in handlers]
-        slf = (
-            "self, "
-            if inspect.getfullargspec(handlers[0]).args[0] == "self"
-            else ""
-        )
+        co = handlers[0].__code__
+        slf = "self, " if co.co_argcount and co.co_varnames[0] == "self" else ""
         return generate_dependent_dispatch(
             tup,
             htup,
@@ -20,6 +20,7 @@ def get_args(tp):
 class TypeNormalizer:
     def __init__(self, generic_handlers=None):
         self.generic_handlers = generic_handlers or TypeMap()
+        self.compiled_annotations = {}
 
     def register_generic(self, generic, handler=None):
         if handler is None:
@@ -31,7 +32,12 @@ class TypeNormalizer:
         from .dependent import DependentType
 
         if isinstance(t, str):
-            t = eval(t, getattr(fn, "__globals__", {}))
+            code = self.compiled_annotations.get(t, None)
+            if code is None:
+                # eval() of a string strips leading whitespace, compile() does not
+                code = compile(t.strip(), "<annotation>", "eval")
+                self.compiled_annotations[t] = code
+            t = eval(code, getattr(fn, "__globals__", {}))
 
         if t is type:
             t = type[object]
@@ -2,6 +2,7 @@
 
 import functools
 import re
+import sys
 import typing
 from itertools import count
 
@@ -126,6 +127,7 @@ class NameDatabase:
         while name in self.registered:
             name = f"{desired_name}{i}"
             i += 1
+        name = sys.intern(name)
         self.registered.add(name)
         return name
 
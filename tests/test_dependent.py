@@ -343,3 +343,16 @@ def test_keyed_plus_other():
     assert f(0, 50) == "yes"
     assert f(3, 50) == "yes"
     assert f(0, 150) == "no"
+
+
+def test_dependent_keyword():
+    @ovld
+    def f(x: int, *, y: Literal[0]):
+        return "zero"
+
+    @ovld
+    def f(x: int, *, y: Literal[1]):
+        return "one"
+
+    assert f(3, y=0) == "zero"
+    assert f(3, y=1) == "one"
@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 from ovld import ovld, recurse
 
 _ovld_exc = None
@@ -50,3 +52,13 @@ def test_global_ovld_dispatch():
         raise _ovld_dispatch_exc
     assert roesti(10) == 100
     assert roesti("alouette") == "alouettealouette"
+
+
+@ovld
+def gratin(x: int):
+    # gratin is in co_names because of the attribute, but is not recursive
+    return SimpleNamespace(gratin=x * 2).gratin
+
+
+def test_global_ovld_attribute_same_name():
+    assert gratin(10) == 20
@@ -1,8 +1,11 @@
 from dataclasses import dataclass
+from graphlib import CycleError
 from typing import Iterable, Mapping
 
-from ovld.dependent import Dependent
-from ovld.mro import Order, subclasscheck, typeorder
+import pytest
+
+from ovld.dependent import Dependent, Equals
+from ovld.mro import Order, sort_types, subclasscheck, typeorder
 from ovld.types import (
     All,
     Dataclass,
@@ -161,6 +164,7 @@ def test_typeorder_dependent():
         typeorder(Dependent[int, identity], Dependent[float, identity])
         is Order.NONE
     )
+    assert typeorder(Equals[1], Equals[2]) is Order.NONE
 
 
 def test_subclasscheck_proxy():
@@ -179,3 +183,62 @@ def test_subclasscheck_proxy():
     assert typeorder(int, Prox[int]) is Order.SAME
     assert typeorder(Prox[int], Prox) is Order.LESS
     assert typeorder(Prox, Prox[int]) is Order.MORE
+
+
+class C(A):
+    pass
+
+
+class D(B, C):
+    pass
+
+
+def test_sort_types():
+    groups = [set(g) for g in sort_types(D, [object, int, A, B, C, D])]
+    assert groups == [{D}, {B, C}, {A}, {object}]
+
+
+def test_sort_types_hooks():
+    prox = Prox[A]
+    groups = [set(g) for g in sort_types(B, [object, int, prox])]
+    assert groups == [{prox}, {object}]
+
+
+def test_sort_types_antichain():
+    pool = [object, int, *[Equals[i] for i in range(10)], Equals[True]]
+    groups = [set(g) for g in sort_types(int, pool)]
+    assert groups == [{Equals[i] for i in range(10)}, {int}, {object}]
+
+
+class Cyclic:
+    @classmethod
+    def __is_supertype__(cls, other):
+        return True
+
+    @classmethod
+    def __type_order__(cls, other):
+        if other is cls.after:
+            return Order.LESS
+        elif cls is getattr(other, "after", None):
+            return Order.MORE
+        return NotImplemented
+
+
+class Cyc1(Cyclic):
+    pass
+
+
+class Cyc2(Cyclic):
+    pass
+
+
+class Cyc3(Cyclic):
+    pass
+
+
+Cyc1.after, Cyc2.after, Cyc3.after = Cyc2, Cyc3, Cyc1
+
+
+def test_sort_types_cycle():
+    with pytest.raises(CycleError):
+        list(sort_types(int, [object, Cyc1, Cyc2, Cyc3]))
@@ -1,4 +1,6 @@
+import functools
 import inspect
+import linecache
 import re
 import sys
 import typing
@@ -17,7 +19,9 @@ from ovld import (
     ovld,
     recurse,
 )
+from ovld.core import Signature
 from ovld.dependent import Dependent, Equals, StartsWith
+from ovld.recode import _clear_codegen_cache
 from ovld.types import UnionTypes
 from ovld.utils import MISSING, UsageError
 
@@ -460,6 +464,38 @@ def test_default_args():
     assert f(3.7) == 10.7
 
 
+def test_signature_wrapped_function():
+    def f(x: int, /, y: str = "y", *, z: float, w=2) -> int:
+        return x
+
+    @functools.wraps(f)
+    def g(*args, **kwargs):  # pragma: no cover
+        return f(*args, **kwargs)
+
+    assert Signature.extract(f) == Signature.extract(g)
+    assert Signature.extract(f).req_names == {"z"}
+
+
+def test_signature_follows_function_changes():
+    def f(x: int, y=1):
+        return x
+
+    def g(x: str, *, z):  # pragma: no cover
+        return x
+
+    assert Signature.extract(f).types == (int, object)
+    f.__annotations__["y"] = str
+    assert Signature.extract(f).types == (int, str)
+    f.__defaults__ = None
+    assert Signature.extract(f).req_pos == 2
+    f.__code__ = g.__code__
+    f.__annotations__ = g.__annotations__
+    f.__kwdefaults__ = None
+    assert Signature.extract(f).types == (str, ("z", object))
+    f.__signature__ = inspect.signature(lambda a: a)
+    assert Signature.extract(f).types == (object,)
+
+
 def test_mixins():
     f = Ovld()
 
@@ -564,6 +600,41 @@ def test_call_next():
     assert f(3) == 8
 
 
+def test_generated_source_after_linecache_clear():
+    @ovld
+    def f(x: int):
+        return x
+
+    f(1)
+    linecache.clearcache()
+
+    @ovld
+    def g(x: int):
+        return x
+
+    g(1)
+    assert g.__code__.co_filename == f.__code__.co_filename
+    assert linecache.getlines(g.__code__.co_filename)
+
+
+def test_call_next_and_recurse():
+    f = Ovld()
+
+    @f.register
+    def f(xs: list):
+        return [recurse(x) for x in xs] + call_next(xs)
+
+    @f.register
+    def f(x: int):
+        return x + 1
+
+    @f.register
+    def f(x: object):
+        return [x]
+
+    assert f([1, 2]) == [2, 3, [1, 2]]
+
+
 def test_call_next_unrelated():
     f = Ovld()
 
@@ -1383,6 +1454,19 @@ def test_string_annotation():
     assert f(Booboo()) == "boo"
 
 
+def test_string_annotation_whitespace():
+    @ovld
+    def f(t: " int"):
+        return "int"
+
+    @f.register
+    def f(t: "list "):
+        return "list"
+
+    assert f(1234) == "int"
+    assert f([1, 2]) == "list"
+
+
 def test_ovld_outside_scope():
     def indirect():
         def f(x: int):
@@ -1531,6 +1615,119 @@ def test_closure_plus_recurse():
     assert thrice([1, 2, 3]) == [3, 6, 9]
 
 
+def test_closure_nonlocal():
+    def make():
+        count = 0
+
+        @ovld
+        def f(xs: list):
+            nonlocal count
+            count += 1
+            return [recurse(x) for x in xs]
+
+        @ovld
+        def f(x: int):
+            return x + count
+
+        return f
+
+    f = make()
+    assert f([1, 2, 3]) == [2, 3, 4]
+    assert f([1, 2, 3]) == [3, 4, 5]
+
+
+def test_recurse_with_super():
+    class Base(metaclass=OvldMC):
+        def f(self, xs):
+            return len(xs)
+
+    class B(Base, metaclass=OvldMC):
+        @ovld
+        def g(self, xs: list):
+            return [recurse(x) for x in xs] + [super().f(xs)]
+
+        def g(self, x: int):
+            return x * 2
+
+    assert B().g([1, 2]) == [2, 4, 2]
+
+
+def test_recurse_in_lambda():
+    f = Ovld()
+    f.register(
+        lambda xs: [recurse(x) for x in xs] if isinstance(xs, list) else xs * 2
+    )
+    assert f([1, 2]) == [2, 4]
+
+
+def test_recurse_in_renamed_function():
+    def f(xs: list):
+        return [recurse(x) for x in xs]
+
+    def g(x: int):
+        return x * 2
+
+    f.__code__ = f.__code__.replace(co_name="renamed")
+    o = Ovld()
+    o.register(f)
+    o.register(g)
+    assert o([1, 2]) == [2, 4]
+
+
+def test_clear_codegen_cache():
+    @ovld
+    def f(xs: list):
+        return [recurse(x) for x in xs]
+
+    @ovld
+    def f(x: int):
+        return x + 1
+
+    assert f([1, 2]) == [2, 3]
+    _clear_codegen_cache()
+
+    @ovld
+    def f(x: str):
+        return x * 2
+
+    assert f([1, "a"]) == [2, "aa"]
+
+
+def test_recode_replaced_code():
+    @ovld
+    def f(xs: list):
+        return [recurse(x) for x in xs]
+
+    @ovld
+    def f(x: int):
+        return x * 2
+
+    def replacement(xs: list):
+        return ["new"] + [recurse(x) for x in xs]
+
+    assert f([1, 2]) == [2, 4]
+    (handler,) = [
+        fn
+        for fn in f.__ovld__.defns.values()
+        if "xs" in fn.__code__.co_varnames
+    ]
+    handler.__code__ = replacement.__code__
+    f.__ovld__.compile()
+    assert f([1, 2]) == ["new", 2, 4]
+
+
+def test_reserved_dispatch_names():
+    @ovld
+    def f(x: int, y: int = 2):
+        return x + y
+
+    with pytest.raises(TypeError):
+        f(1, __MAP__={})
+    with pytest.raises(TypeError):
+        f(1, __MISSING__=3)
+    assert f(1) == 3
+
+
 def test_no_kwargs():
     with pytest.raises(TypeError):
 
@@ -1633,6 +1830,32 @@ def test_keywords_recurse():
     assert f([1, 2, 3], factor=3) == [3, 6, 9]
 
 
+def test_keywords_with_optional_positional():
+    @ovld
+    def f(x: int, y: int = 1, *, k: int, m: int = 5):
+        return (x, y, k, m)
+
+    assert f(1, k=2) == (1, 1, 2, 5)
+    assert f(1, 2, k=3) == (1, 2, 3, 5)
+    assert f(1, k=2, m=3) == (1, 1, 2, 3)
+    assert f(1, 2, k=3, m=4) == (1, 2, 3, 4)
+
+
+def test_many_optional_keywords():
+    @ovld
+    def f(x: int, *, a: int = 0, b: int = 0, c: int = 0, d: int = 0):
+        return x + a + b + c + d
+
+    @f.register
+    def f(x: int, *, a: str, b: int = 0, c: int = 0, d: int = 0):
+        return a
+
+    assert f(1) == 1
+    assert f(1, b=2, d=3) == 6
+    assert f(1, a=1, b=2, c=3, d=4) == 11
+    assert f(1, a="a", c=3) == "a"
+
+
 def test_passing_types_to_normal_func():
     @ovld
     def f(x):
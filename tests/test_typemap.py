@@ -199,3 +199,16 @@ def test_cache_invalidation():
     tm.register(mksig((Cat, Cat), 2, 2), "CC")
     assert (Cat, Cat) not in tm
     assert _get(tm, Cat, Cat) == ["CC"]
+
+
+def test_single_argument_map():
+    tm = MultiTypeMap()
+
+    tm.register(mksig((Animal,), 1, 1), "A")
+    assert tm.single[Cat] == "A"
+    assert Cat in tm.single
+
+    tm.register(mksig((Mammal,), 1, 1), "M")
+    assert Cat not in tm.single
+    assert tm.single[Cat] == "M"
+    assert tm.single[Robin] == "A"